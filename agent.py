@@ -154,11 +154,13 @@ Now you can try again, utilize tools to complete your task!
                     yield token
                 yield "\n|||\n"
                 
-                # Process any tool calls in the response
-                prompt = ""
+                # Process any tool calls in the response, collecting the output
+                # as chunks and joining once rather than growing a string
+                tool_output = []
                 async for char in self._process_tool_call("".join(buffer)):
-                    prompt += char
+                    tool_output.append(char)
                     yield char
+                prompt = "".join(tool_output)
                 
                 if prompt != "":
                     yield "\n|||\n"
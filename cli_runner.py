@@ -6,6 +6,11 @@ from config_loader import load_from_file
 from typing import Optional, Union
 from ask_tool import read_multiline_stdin
 
+try:
+    import uvloop
+except ImportError:  # uvloop is POSIX-only; fall back to the stdlib loop
+    uvloop = None
+
 original_stdout = sys.stdout
 def safe_write(text):
     """Safely write to original stdout"""
@@ -66,8 +71,9 @@ def main():
     parser.add_argument('--work-dir', required=False, default=None, help='Directory to switch to after loading config')
     args = parser.parse_args()
 
+    run = uvloop.run if uvloop is not None else asyncio.run
     try:
-        asyncio.run(run_with_config(args.config, args.prompt, args.worker_mode, args.work_dir))
+        run(run_with_config(args.config, args.prompt, args.worker_mode, args.work_dir))
     except Exception as e:
         print(f"Error: {str(e)}", file=sys.stderr)
 
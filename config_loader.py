@@ -4,6 +4,13 @@ from jinja2 import Environment, FileSystemLoader, Template
 import json
 from typing import Any, Dict, Optional, Union
 
+# Prefer the libyaml-backed loader; it is several times faster than the
+# pure-Python one and accepts the same python/object tags.
+try:
+    from yaml import CUnsafeLoader as _YamlLoader
+except ImportError:
+    from yaml import UnsafeLoader as _YamlLoader
+
 class ConfigLoadError(Exception):
     """Base exception for configuration loading errors."""
     pass
@@ -34,7 +41,7 @@ def do_load_yaml(path: str) -> Any:
     """
     try:
         with open(path) as f:
-            return yaml.unsafe_load(f)
+            return yaml.load(f, Loader=_YamlLoader)
     except yaml.YAMLError as e:
         raise ConfigLoadError(f"Failed to parse YAML file {path}: {str(e)}")
     except IOError as e:
@@ -86,6 +93,12 @@ def do_load_j2(path: str) -> Template:
     except Exception as e:
         raise TemplateRenderError(f"Failed to load template {path}: {str(e)}")
 
+# Loader for each supported extension; anything else is parsed as YAML
+_LOADERS = {
+    '.json': do_load_json,
+    '.j2': do_load_j2,
+}
+
 def load_from_file(
     path: str, 
     name: Optional[str] = None, 
@@ -119,12 +132,7 @@ def load_from_file(
     _, ext = os.path.splitext(path.lower())
     
     try:
-        if ext == '.json':
-            obj = do_load_json(path)
-        elif ext == '.j2':
-            obj = do_load_j2(path)
-        else:
-            obj = do_load_yaml(path)
+        obj = _LOADERS.get(ext, do_load_yaml)(path)
         
         # Cache the loaded object
         _loaded_objects[name] = obj
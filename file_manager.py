@@ -1,5 +1,106 @@
-import aiofiles
+import asyncio
+import mmap
 import os
+import stat
+import tempfile
+
+# Files above this size are decoded straight from a memory map
+MMAP_THRESHOLD = 256 * 1024
+
+def _open_noatime(path: str, flags: int) -> int:
+    """open() opener that skips the access-time update, and the inode write it costs (Linux only)."""
+    try:
+        return os.open(path, flags | getattr(os, 'O_NOATIME', 0))
+    except PermissionError:
+        # O_NOATIME is refused on files we don't own
+        return os.open(path, flags)
+
+def _read_text(path: str) -> str:
+    """Open, read and close a file in one go (runs in a worker thread)."""
+    # Going through open() keeps the path in error messages
+    with open(path, mode='rb', opener=_open_noatime) as f:
+        fd = f.fileno()
+        st = os.fstat(fd)
+        regular = stat.S_ISREG(st.st_mode)
+        # Tell the kernel the whole file is about to be read front to back so
+        # it can widen read-ahead (Linux/POSIX only). Only regular files take
+        # the hints; on pipes and FIFOs they fail with ESPIPE
+        if regular and hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        # Decode the whole file at once; large files are decoded from the
+        # mapped page cache without first copying them into a bytes object
+        mm = None
+        if regular and st.st_size > MMAP_THRESHOLD:
+            try:
+                mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                pass
+        if mm is not None:
+            with mm:
+                content = str(mm, 'utf-8')
+        else:
+            content = f.read().decode('utf-8')
+    # Apply the same universal-newline translation text mode would, skipping
+    # it when there is no '\r' at all
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+def _write_in_place(path: str, content: str):
+    with open(path, mode='w', encoding='utf-8') as f:
+        f.write(content)
+
+def _write_text(path: str, content: str):
+    """Replace a file's content atomically where possible (runs in a worker thread).
+
+    The text goes to a temporary file in the same directory, is synced to disk
+    and then renamed over the target, so readers never see a half-written file
+    and a crash leaves either the old or the new content. Swapping the file
+    would bypass the file's own write permission, detach hard links, reset its
+    owner and turn special files into regular ones, so read-only files,
+    non-regular files, files with extra links or another owner, new files,
+    and files in directories we can't create files in are written in place
+    instead. Other metadata, such as ACLs, is not carried over by the swap.
+    """
+    # Replace the file a symlink points to rather than the link itself
+    path = os.path.realpath(path)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        _write_in_place(path, content)
+        return
+    if (
+        # The swap only needs the directory to be writable; going in place
+        # makes a read-only file fail with PermissionError as it should
+        not os.access(path, os.W_OK)
+        or not stat.S_ISREG(st.st_mode)
+        or st.st_nlink > 1
+        or (hasattr(os, 'getuid') and st.st_uid != os.getuid())
+    ):
+        _write_in_place(path, content)
+        return
+
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    except OSError:
+        # e.g. a writable file in a read-only directory
+        _write_in_place(path, content)
+        return
+    try:
+        with open(fd, mode='w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600; keep the original permissions
+        os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 class FileManager:
     def __init__(self):
@@ -21,11 +122,11 @@ class FileManager:
         if abs_path in self.cache:
             return self.cache[abs_path]
         else:
-
-            async with aiofiles.open(abs_path, mode='r', encoding='utf-8') as f:
-                content = await f.read()
-                self.cache[abs_path] = content
-                return content
+            # One executor hop instead of separate open/read/close round trips
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(None, _read_text, abs_path)
+            self.cache[abs_path] = content
+            return content
 
     async def write_file(self, path: str, content: str):
         """Write content to a file.
@@ -37,8 +138,8 @@ class FileManager:
         # Resolve absolute path
         abs_path = os.path.abspath(path)
 
-        async with aiofiles.open(abs_path, mode='w', encoding='utf-8') as f:
-            await f.write(content)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _write_text, abs_path, content)
             
         # Update cache with the new content
         self.cache[abs_path] = content
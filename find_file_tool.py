@@ -1,27 +1,183 @@
 from tool import Tool
+import heapq
 import os
-from typing import List, Optional
-from agent import Agent
+from typing import Dict, List, Optional
+from chat_streamer import ChatStreamer
+
+def _lev_bounded(a: str, b: str, max_k: int) -> int:
+    """
+    Levenshtein distance between a and b, giving up early once it must exceed max_k.
+
+    Returns:
+        The distance, or max_k + 1 if it is larger than max_k
+    """
+    if abs(len(a) - len(b)) > max_k:
+        return max_k + 1
+    # Keep the rows as short as the shorter string
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            current.append(distance)
+            if distance < row_min:
+                row_min = distance
+        # Every later row is at least this row's minimum
+        if row_min > max_k:
+            return max_k + 1
+        previous = current
+    return min(previous[-1], max_k + 1)
+
+def _bigrams(text: str) -> frozenset:
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1))
+
+# Candidates that go on to the Levenshtein pass after bigram ranking
+FUZZY_CANDIDATES = 32
 
 class FindFileTool(Tool):
-    def __init__(self, agent: Agent):
-        self.agent = agent
-        
-    def _get_all_files_recursive(self) -> List[str]:
+    def __init__(self, chat_streamer: Optional[ChatStreamer] = None):
+        # A streamer of the tool's own, not the agent's: the fallback needs a
+        # single plain completion, not a tool-using session
+        self.chat_streamer = chat_streamer
+        # File list from the last scan, plus the mtime of every directory it
+        # covered; adding, removing or renaming an entry bumps its directory's mtime
+        self._files_cache: Optional[List[str]] = None
+        self._files_cache_sig: Optional[tuple] = None
+        # Bigram sets of the compared strings, rebuilt along with the file list
+        self._bigram_cache = {}
+        # Base name -> listed paths with that name, rebuilt along with the file list
+        self._by_basename: Dict[str, List[str]] = {}
+
+    def _get_all_files_recursive(self):
+        """Walk the current directory with os.scandir, returning the file list and the directory mtimes seen."""
         file_list = []
-        for root, _, files in os.walk('.'):
-            for file in files:
-                file_list.append(os.path.join(root, file))
-        return file_list
-        
+        dir_mtimes = {}
+        stack = ['.']
+        while stack:
+            directory = stack.pop()
+            try:
+                # Stamp before listing so a change made mid-scan forces a rescan
+                dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+                with os.scandir(directory) as entries:
+                    subdirs = []
+                    for entry in entries:
+                        # Same split as os.walk: symlinked directories are
+                        # neither listed nor descended into
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                        else:
+                            file_list.append(entry.path)
+                    stack.extend(reversed(subdirs))
+            except OSError:
+                continue
+        return file_list, dir_mtimes
+
+    def _file_list(self) -> List[str]:
+        """Return the cached file list, rescanning only if a directory changed."""
+        cwd = os.getcwd()
+        if self._files_cache is not None:
+            cached_cwd, dir_mtimes = self._files_cache_sig
+            try:
+                if cached_cwd == cwd and all(
+                    os.stat(directory).st_mtime_ns == mtime
+                    for directory, mtime in dir_mtimes.items()
+                ):
+                    return self._files_cache
+            except OSError:
+                pass
+        files, dir_mtimes = self._get_all_files_recursive()
+        self._files_cache = files
+        self._files_cache_sig = (cwd, dir_mtimes)
+        self._bigram_cache = {}
+        self._by_basename = {}
+        for path in files:
+            self._by_basename.setdefault(os.path.basename(path), []).append(path)
+        return files
+
     async def _fuzzy_match(self, filename: str) -> Optional[str]:
-        all_files = self._get_all_files_recursive()
+        """Return the listed file closest to filename, or None if nothing is close enough."""
+        all_files = self._file_list()
+        target = os.path.normpath(filename)
+        # A bare name is compared against base names, a path against whole paths
+        bare = os.path.basename(target) == target
+
+        # The usual miss is the right file name in the wrong directory: take the
+        # file with that exact name, preferring the one sharing the most trailing
+        # path components (then components anywhere) with the query
+        same_name = self._by_basename.get(os.path.basename(target))
+        if same_name:
+            target_parts = target.split(os.sep)[::-1]
+
+            def closeness(path):
+                parts = os.path.normpath(path).split(os.sep)[::-1]
+                suffix = 0
+                for a, b in zip(parts, target_parts):
+                    if a != b:
+                        break
+                    suffix += 1
+                return suffix, len(set(parts).intersection(target_parts))
+
+            return max(same_name, key=closeness)
+
+        candidates = [(path, os.path.basename(path) if bare else os.path.normpath(path)) for path in all_files]
+
+        # Rank by bigram Jaccard similarity first so the DP only runs on the
+        # handful of candidates that share most of their bigrams with the query
+        if len(candidates) > FUZZY_CANDIDATES:
+            target_bigrams = _bigrams(target)
+            bigram_cache = self._bigram_cache
+
+            def jaccard(item):
+                text = item[1]
+                bigrams = bigram_cache.get(text)
+                if bigrams is None:
+                    bigrams = bigram_cache[text] = _bigrams(text)
+                union = len(target_bigrams | bigrams)
+                return len(target_bigrams & bigrams) / union if union else 0.0
+
+            candidates = heapq.nlargest(FUZZY_CANDIDATES, candidates, key=jaccard)
+
+        best_match = None
+        max_k = max(2, len(target) // 3)
+        for path, candidate in candidates:
+            distance = _lev_bounded(target, candidate, max_k)
+            if distance <= max_k:
+                best_match = path
+                if distance == 0:
+                    break
+                # Only strictly closer candidates are worth computing from here on
+                max_k = distance - 1
+        if best_match is not None:
+            return best_match
+
+        # Asking the model is seconds of network round trip, so it is opt-in
+        if self.chat_streamer is None or not os.getenv("SKRYVIX_LLM_FUZZY_MATCH"):
+            return None
         prompt = f"""Find the closest match to '{filename}' from these files:
 {chr(10).join(all_files)}
 Respond with just the best matching filename."""
-        
-        response = await self.agent(prompt)
-        return response.strip() if response else None
+
+        # Each lookup is one independent question and answer
+        self.chat_streamer.clear_history()
+        parts = []
+        async for token, reasoning in self.chat_streamer.chat(prompt):
+            if not reasoning:
+                parts.append(token)
+        # Only trust the answer if it names one of the listed files; chat()
+        # reports failures as an "Exception: ..." answer
+        lines = [line.strip().strip('`\'"').strip() for line in ''.join(parts).splitlines()]
+        lines = [line for line in lines if line]
+        if not lines:
+            return None
+        answer = os.path.normpath(lines[-1])
+        for path in all_files:
+            if os.path.normpath(path) == answer:
+                return path
+        return None
 
     def name(self) -> str:
         return "find_file"
@@ -47,10 +203,10 @@ Returns the path of the best matching file if found, or an error message if not
                 return
                 
             # If not found, try fuzzy matching
-            #matched = await self._fuzzy_match(filename)
-            #if matched and os.path.exists(matched):
-            #    yield matched
-            #else:
-            #    yield f"Error: File not found - {filename}"
+            matched = await self._fuzzy_match(filename)
+            if matched and os.path.exists(matched):
+                yield matched
+            else:
+                yield f"Error: File not found - {filename}"
         except Exception as e:
             yield f"Error finding file {filename}: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,162 @@
+
+import sys
+import threading
+import contextvars
+import weakref
+
+_install_lock = threading.Lock()
+
+# Sinks inherited by threads started during a captured run, keyed by Thread.
+# Context variables don't cross into new threads, so without this anything
+# user code prints from its own threads would bypass the capture.
+_thread_sinks = weakref.WeakKeyDictionary()
+_thread_start = threading.Thread.start
+
+class OutputRouter:
+    """
+    Stand-in for sys.stdout / sys.stderr that forwards writes to the sink set
+    for the current context, or to the wrapped stream when no sink is set.
+    Lets concurrent tool executions capture their own output without swapping
+    the process-wide stream.
+    """
+
+    def __init__(self, stream, name):
+        self.stream = stream
+        self.sink = contextvars.ContextVar(f"{name}_sink", default=None)
+
+    def current_sink(self):
+        """The sink for the calling thread, or None to write to the wrapped stream."""
+        sink = self.sink.get()
+        if sink is None and _thread_sinks:
+            sinks = _thread_sinks.get(threading.current_thread())
+            if sinks:
+                sink = sinks.get(self)
+        # A thread outliving its run writes to the real stream again
+        if sink is not None and getattr(sink, "closed", False):
+            return None
+        return sink
+
+    def write(self, text):
+        sink = self.current_sink()
+        if sink is None:
+            return self.stream.write(text)
+        return sink.write(text)
+
+    def flush(self):
+        sink = self.current_sink()
+        if sink is None:
+            self.stream.flush()
+        else:
+            sink.flush()
+
+    def __getattr__(self, name):
+        # encoding, isatty(), fileno() etc. come from the wrapped stream
+        return getattr(self.stream, name)
+
+def _start_with_sinks(thread):
+    """Thread.start replacement that hands the starting thread's sinks to the new thread."""
+    sinks = {}
+    for router in (sys.stdout, sys.stderr):
+        if isinstance(router, OutputRouter):
+            sink = router.current_sink()
+            if sink is not None:
+                sinks[router] = sink
+    if sinks:
+        # Recorded before starting so even the thread's first write is captured
+        _thread_sinks[thread] = sinks
+    return _thread_start(thread)
+
+def install():
+    """
+    Install routers as sys.stdout and sys.stderr, and make threads inherit the
+    sinks of the thread that starts them. Safe to call repeatedly; a stream
+    that was replaced since the last call gets wrapped again.
+    """
+    with _install_lock:
+        if not isinstance(sys.stdout, OutputRouter):
+            sys.stdout = OutputRouter(sys.stdout, "stdout")
+        if not isinstance(sys.stderr, OutputRouter):
+            sys.stderr = OutputRouter(sys.stderr, "stderr")
+        threading.Thread.start = _start_with_sinks
+
+def run_captured(func, *args, stdout=None, stderr=None):
+    """
+    Call func(*args) with stdout and/or stderr of the current context routed to
+    the given sinks. Meant to run inside an executor thread: writes from that
+    thread, and from threads it starts while func runs, are captured.
+
+    Args:
+        func: Callable to run
+        *args: Positional arguments for func
+        stdout: Sink for sys.stdout writes, or None to leave stdout alone
+        stderr: Sink for sys.stderr writes, or None to leave stderr alone
+
+    Returns:
+        The return value of func
+    """
+    install()
+    tokens = []
+    for router, sink in ((sys.stdout, stdout), (sys.stderr, stderr)):
+        if sink is not None:
+            tokens.append((router, router.sink.set(sink)))
+    try:
+        return func(*args)
+    finally:
+        for router, token in reversed(tokens):
+            router.sink.reset(token)
+
+class QueuedOutput:
+    """
+    Sink for run_captured that hands text written from a worker thread to an
+    asyncio.Queue on the event loop. Writes are coalesced: buffered text is
+    queued as one chunk once `limit` characters have accumulated, when the
+    writer calls flush(), or `delay` seconds after the first buffered write.
+    """
+
+    def __init__(self, loop, queue, delay=0.008, limit=4096):
+        self.loop = loop
+        self.queue = queue
+        self.delay = delay
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._size = 0
+        self._scheduled = False
+        self.closed = False
+
+    def write(self, text):
+        if not text:  # Only process non-empty text
+            return
+        with self._lock:
+            self._buffer.append(text)
+            self._size += len(text)
+            if self._size >= self.limit:
+                self.loop.call_soon_threadsafe(self.drain)
+            elif not self._scheduled:
+                self._scheduled = True
+                self.loop.call_soon_threadsafe(self.loop.call_later, self.delay, self.drain)
+
+    def flush(self):
+        with self._lock:
+            if self._buffer:
+                self.loop.call_soon_threadsafe(self.drain)
+
+    def drain(self):
+        """Queue everything buffered so far as one chunk. Must run on the loop."""
+        with self._lock:
+            self._scheduled = False
+            if not self._buffer:
+                return
+            text = "".join(self._buffer)
+            self._buffer.clear()
+            self._size = 0
+        self.queue.put_nowait(text)
+
+    def close(self, sentinel):
+        """
+        Queue what is still buffered, then `sentinel` to mark the end of output.
+        Must run on the loop, e.g. from the executor future's done-callback.
+        """
+        self.closed = True
+        self.drain()
+        self.queue.put_nowait(sentinel)
@@ -1,9 +1,55 @@
 
 from tool import Tool
+import output_router
 import sys
-from io import StringIO
 import os
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+
+# 输出队列的结束标记
+_SENTINEL = object()
+
+# 所有调用共用的执行线程池
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="python-tool")
+
+# 按语法树摘要缓存的代码对象，只有空白、注释不同的代码共用同一个代码对象
+_AST_CACHE = OrderedDict()
+_AST_CACHE_SIZE = 512
+_AST_CACHE_LOCK = threading.Lock()
+
+def _compile_ast(source):
+    """解析源码，以语法树摘要为键查找或编译代码对象"""
+    tree = ast.parse(source, "<python_tool>")
+    key = hashlib.blake2b(ast.dump(tree).encode(), digest_size=16).digest()
+    with _AST_CACHE_LOCK:
+        code_obj = _AST_CACHE.get(key)
+        if code_obj is not None:
+            _AST_CACHE.move_to_end(key)
+            return code_obj
+    code_obj = compile(tree, "<python_tool>", "exec")
+    with _AST_CACHE_LOCK:
+        _AST_CACHE[key] = code_obj
+        if len(_AST_CACHE) > _AST_CACHE_SIZE:
+            _AST_CACHE.popitem(last=False)
+    return code_obj
+
+@lru_cache(maxsize=256)
+def _compile(source):
+    """编译用户代码，相同的源码直接复用已编译的代码对象，无需重新解析"""
+    return _compile_ast(source)
+
+def _exec_source(source, namespace):
+    exec(_compile(source), namespace)
+
 class PythonTool(Tool):
+    def __init__(self):
+        # 持久化的命名空间，多次调用之间共享变量、函数和已导入的模块
+        self.namespace = {}
+
     def name(self)->str:
         return "python"
     def description(self) -> str:
@@ -20,74 +66,47 @@ In order to complete your development task, you can write python code to manipul
 
     async def __call__(self, args: str):
         import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-        import threading
-        import queue
 
-        # 创建一个队列用于存储输出
-        output_queue = queue.Queue()
+        loop = asyncio.get_running_loop()
+        # 创建一个异步队列用于存储输出，由执行线程通过事件循环写入
+        output_queue = asyncio.Queue()
         
-        # 创建自定义的stdout来捕获输出
-        class QueuedOutput:
-            def __init__(self, queue):
-                self.queue = queue
-                
-            def write(self, text):
-                if text:  # 只处理非空文本
-                    self.queue.put(text)
-                    
-            def flush(self):
-                pass
-
-        # 保存原始stdout
-        old_stdout = sys.stdout
-        # 设置新的stdout
-        sys.stdout = QueuedOutput(output_queue)
-
-        # 创建一个事件来标识执行是否完成
-        execution_done = threading.Event()
-        execution_error = None
-
-        # 在线程中执行Python代码
-        def execute_code():
-            nonlocal execution_error
-            try:
-                exec(args)
-            except Exception as e:
-                execution_error = str(e)
-            finally:
-                execution_done.set()
-
-        # 使用线程池执行代码
-        with ThreadPoolExecutor() as executor:
-            executor.submit(execute_code)
+        # 捕获执行线程的stdout，合并短时间内的多次写入后再放入队列
+        queued_output = output_router.QueuedOutput(loop, output_queue)
 
         # 跟踪是否有过任何输出
         had_output = False
-        
+
+        # 使用共享线程池执行代码，只捕获执行线程的stdout（不替换全局stdout），执行结束后放入结束标记
+        run = partial(
+            output_router.run_captured, _exec_source, args, self.namespace,
+            stdout=queued_output
+        )
+        future = loop.run_in_executor(_EXECUTOR, run)
+        # 执行结束后先取出剩余的缓冲输出，再放入结束标记
+        future.add_done_callback(lambda _: queued_output.close(_SENTINEL))
+
+        # 等待输出队列，直到收到结束标记
+        while True:
+            output = await output_queue.get()
+            if output is _SENTINEL:
+                break
+            had_output = True
+            yield output
+
+        execution_error = None
         try:
-            # 循环检查输出队列，直到执行完成
-            while not execution_done.is_set() or not output_queue.empty():
-                try:
-                    # 每100ms检查一次队列
-                    output = output_queue.get_nowait()
-                    had_output = True
-                    yield output
-                except queue.Empty:
-                    await asyncio.sleep(0.1)
-                    continue
-
-            # 如果发生了异常，yield异常信息
-            if execution_error:
-                yield f"Exception: {execution_error}"
-                had_output = True
-            # 只有在完全没有输出时才显示成功消息
-            elif not had_output:
-                yield "Python code executed successfully, no output"
-
-        finally:
-            # 恢复原始stdout
-            sys.stdout = old_stdout
+            await future
+        except (Exception, SystemExit) as e:
+            execution_error = str(e)
+
+        # 如果发生了异常，yield异常信息
+        if execution_error:
+            yield f"Exception: {execution_error}"
+            had_output = True
+        # 只有在完全没有输出时才显示成功消息
+        elif not had_output:
+            yield "Python code executed successfully, no output"
 
 async def test():
     # 保存原始的stdout
@@ -1,15 +1,20 @@
 
 from tool import Tool
+import output_router
 import sys
-from io import StringIO
 import os
+import functools
 import code
 import traceback
-import threading
-import queue
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
+# Marks the end of output for a single execution
+_SENTINEL = object()
+
+# Shared by all interpreter instances instead of a pool per call
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="python-interpreter")
+
 class PythonInterpreterTool(Tool):
     def __init__(self):
         # Create a dictionary to store the interpreter's namespace
@@ -40,78 +45,50 @@ The interpreter maintains state between executions, allowing you to:
 """
 
     async def __call__(self, args: str):
-        # Create queues for stdout and stderr
-        output_queue = queue.Queue()
+        loop = asyncio.get_running_loop()
+        # Create an asyncio queue fed from the execution thread
+        output_queue = asyncio.Queue()
         
-        class CombinedOutput:
-            def __init__(self, queue):
-                self.queue = queue
-                
-            def write(self, text):
-                if text:  # Only process non-empty text
-                    self.queue.put(text)
-                    
-            def flush(self):
-                pass
+        had_output = False
 
-        # Save original stdout and stderr
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        
-        # Create and set new output captures
-        combined_output = CombinedOutput(output_queue)
-        sys.stdout = combined_output
-        sys.stderr = combined_output
+        # Run in the shared pool; the sentinel is queued once the call finishes,
+        # after every output chunk it produced. runsource compiles the input
+        # (reporting syntax errors like the console does) and returns True
+        # when the block is incomplete. Only writes from the execution thread
+        # are routed into the queue; the process-wide streams stay in place.
+        combined_output = output_router.QueuedOutput(loop, output_queue)
+        run = functools.partial(
+            output_router.run_captured, self.interpreter.runsource, args, "<user>", "exec",
+            stdout=combined_output, stderr=combined_output
+        )
+        future = loop.run_in_executor(_EXECUTOR, run)
+        # Flush whatever is still buffered before marking the end of output
+        future.add_done_callback(lambda _: combined_output.close(_SENTINEL))
+
+        # Wait for output until the execution thread signals completion
+        while True:
+            output = await output_queue.get()
+            if output is _SENTINEL:
+                break
+            had_output = True
+            yield output
 
-        # Create an event to signal execution completion
-        execution_done = threading.Event()
         execution_error = None
-
-        def execute_code():
-            nonlocal execution_error
-            try:
-                # Use runcode which handles multi-line statements, compilation, and execution
-                incomplete = self.interpreter.runcode(args)
-                if incomplete:
-                    execution_error = "Incomplete code block: More input is needed."
-            except Exception as e:
-                # Capture any exception during compilation or execution
-                execution_error = ''.join(traceback.format_exc())
-            finally:
-                # Signal that execution has finished
-                execution_done.set()
-
-        # Use thread pool to execute code
-        with ThreadPoolExecutor() as executor:
-            executor.submit(execute_code)
-
-        had_output = False
-        
         try:
-            # Check output queue until execution is complete
-            while not execution_done.is_set() or not output_queue.empty():
-                try:
-                    # Check queue every 100ms
-                    output = output_queue.get_nowait()
-                    if output.strip():
-                        had_output = True
-                    yield output
-                except queue.Empty:
-                    await asyncio.sleep(0.1)
-                    continue
-
-            # If there was an error, yield the error information
-            if execution_error:
-                yield f"{execution_error}"
-                had_output = True
-            # Only show success message if there was no output
-            elif not had_output:
-                yield "Code executed successfully with no output\n"
-
-        finally:
-            # Restore original stdout and stderr
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
+            incomplete = await future
+            if incomplete:
+                execution_error = "Incomplete code block: More input is needed."
+        except (Exception, SystemExit):
+            # Capture any exception during compilation or execution
+            execution_error = ''.join(traceback.format_exc())
+
+        # If there was an error, yield the error information
+        if execution_error:
+            yield f"{execution_error}"
+            had_output = True
+        # Only show success message if there was no output
+        elif not had_output:
+            yield "Code executed successfully with no output\n"
 
 async def test():
     # Save original stdout
@@ -1,9 +1,14 @@
 from tool import Tool
-import aiofiles
+import asyncio
+import os
 from find_file_tool import FindFileTool
 from agent import Agent
 from file_manager import FileManager
 
+# Upper bound on reads in flight at once, so a long path list can't exhaust
+# file descriptors or flood the default executor
+MAX_CONCURRENT_READS = 16
+
 class ReadFileTool(Tool):
     def __init__(self, file_manager: FileManager):
         self.file_manager = file_manager
@@ -21,13 +26,38 @@ The content of the files will be shown to you in the last message.
 """
     
     async def __call__(self, args: str):
-        file_paths = args.split('\n')
+        file_paths = list(filter(None, (path.strip() for path in args.splitlines())))
+
+        # Missing paths are reported straight away instead of taking an executor
+        # round trip just to fail. Cached files are served from the cache as
+        # before, and other problems (directories, permissions, races) are
+        # left for the read to report
+        cache = self.file_manager.cache
+        existing = [
+            path for path in file_paths
+            if os.path.abspath(path) in cache or os.path.exists(path)
+        ]
+
+        # Created per call: on Python < 3.10 a semaphore binds to the loop it
+        # was created under
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+        async def read_one(path):
+            async with semaphore:
+                return await self.file_manager.read_file(path)
+
+        # Read all files concurrently, then report in the requested order
+        results = await asyncio.gather(
+            *(read_one(path) for path in existing),
+            return_exceptions=True
+        )
+        results = dict(zip(existing, results))
         for path in file_paths:
-            path = path.strip()
-            if not path:
+            if path not in results:
+                yield f"Error: File not found - {path}"
                 continue
-            try:
-                await self.file_manager.read_file(path)
+            result = results[path]
+            if isinstance(result, Exception):
+                yield f"Error reading {path}: {str(result)}"
+            else:
                 yield f"Successfully read the file {path}"
-            except Exception as e:
-                yield f"Error reading {path}: {str(e)}"
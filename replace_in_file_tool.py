@@ -1,8 +1,77 @@
 from tool import Tool
-import aiofiles
+from functools import lru_cache
 import re
 
 
+@lru_cache(maxsize=512)
+def _compile_search(search_content: str):
+    """Compile a SEARCH block into a literal pattern whose newlines also match CRLF."""
+    # Escape each line on its own and join with a pattern that matches both \n and \r\n
+    search_escaped = '\\r?\\n'.join(map(re.escape, search_content.split('\n')))
+    return re.compile(search_escaped, re.MULTILINE)
+
+
+# Marker lines of a SEARCH/REPLACE block; surrounding whitespace is ignored
+_MARKER_RE = re.compile(r'^[^\S\n]*(<<<<<<< SEARCH|=======|>>>>>>> REPLACE)[^\S\n]*$', re.MULTILINE)
+
+
+def _between(text: str, opening, closing) -> str:
+    """Lines strictly between two marker matches, without the newlines next to the markers."""
+    segment = text[opening.end():closing.start()]
+    return segment[1:-1] if len(segment) > 1 else ''
+
+
+def _parse_blocks(text: str):
+    """
+    Split replace_in_files input into per-file edits with a single scan over the
+    marker lines.
+
+    Returns:
+        List of (file_path, blocks, error) tuples, where blocks is a list of
+        (search, replace) pairs and error is set when the last block was left open
+    """
+    # FileManager hands out content with \n line endings, so CRLF input would
+    # otherwise leave a stray \r at the end of every SEARCH line
+    text = text.replace('\r\n', '\n')
+    files = []
+    expected = "<<<<<<< SEARCH"
+    header_start = 0
+    opening = separator = None
+
+    def add_paths(segment):
+        for line in segment.split('\n'):
+            file_path = line.strip()
+            if file_path:
+                files.append((file_path, [], None))
+
+    for marker in _MARKER_RE.finditer(text):
+        # Markers other than the expected one are plain text at this point
+        if marker.group(1) != expected:
+            continue
+        if expected == "<<<<<<< SEARCH":
+            # Non-empty lines since the previous block are file paths; the last
+            # one owns the blocks that follow
+            add_paths(text[header_start:marker.start()])
+            opening = marker
+            expected = "======="
+        elif expected == "=======":
+            separator = marker
+            expected = ">>>>>>> REPLACE"
+        else:
+            if files:
+                files[-1][1].append((_between(text, opening, separator), _between(text, separator, marker)))
+            header_start = marker.end()
+            expected = "<<<<<<< SEARCH"
+
+    if expected == "<<<<<<< SEARCH":
+        add_paths(text[header_start:])
+    elif files:
+        error = "Unclosed SEARCH block" if expected == "=======" else "Unclosed REPLACE block"
+        file_path, blocks, _ = files[-1]
+        files[-1] = (file_path, blocks, error)
+    return files
+
+
 class ReplaceInFileTool(Tool):
     def __init__(self, file_manager):
         """Initialize ReplaceInFileTool with FileManager"""
@@ -36,8 +105,8 @@ Replaces the first occurrence of the search content with the replacement content
 """
 
     async def __call__(self, args: str):
-        lines = args.strip().split('\n')
-        if not lines:
+        text = args.strip()
+        if not text:
             yield "Error: Empty input"
             return
 
@@ -47,125 +116,79 @@ Replaces the first occurrence of the search content with the replacement content
         total_blocks = 0
         overall_report = []
 
-        current_pos = 0
-        while current_pos < len(lines):
-            # Skip empty lines
-            while current_pos < len(lines) and not lines[current_pos].strip():
-                current_pos += 1
-            if current_pos >= len(lines):
-                break
-
-            # Check if this line is a file path (not a SEARCH block)
-            if not lines[current_pos].strip().startswith("<<<<<<< SEARCH"):
-                file_path = lines[current_pos].strip()
-                if not file_path:
-                    current_pos += 1
-                    continue
-
-                # Initialize per-file tracking
-                successful_replacements = 0
-                messages = []
-                block_number = 0
-                modified = False
-
-                # Read file content
+        for file_path, blocks, parse_error in _parse_blocks(text):
+            # Initialize per-file tracking
+            successful_replacements = 0
+            messages = []
+            block_number = 0
+            modified = False
+
+            # Read file content
+            try:
+                content = await self.file_manager.read_file(file_path)
+            except FileNotFoundError:
+                overall_report.append(f"\nError: File not found: {file_path}")
+                continue
+            except Exception as e:
+                overall_report.append(f"\nError reading file {file_path}: {str(e)}")
+                continue
+
+            total_files += 1
+            has_cr = '\r' in content
+
+            # Process SEARCH/REPLACE blocks for this file
+            for search_content, replace_content in blocks:
+                block_number += 1
+                total_blocks += 1
                 try:
-                    content = await self.file_manager.read_file(file_path)
-                except FileNotFoundError:
-                    overall_report.append(f"\nError: File not found: {file_path}")
-                    current_pos += 1
-                    continue
+                    if not has_cr:
+                        # Plain substring search; the regex is only needed to
+                        # let \n in the SEARCH block match \r\n in the file
+                        start = content.find(search_content)
+                        end = start + len(search_content)
+                    else:
+                        pattern = _compile_search(search_content)
+                        match = pattern.search(content)
+                        start, end = match.span() if match else (-1, -1)
+
+                    if start >= 0:
+                        content = content[:start] + replace_content + content[end:]
+                        modified = True
+                        successful_replacements += 1
+                        total_replacements += 1
+                        messages.append(f"Block {block_number}: Successfully replaced content")
+                    else:
+                        messages.append(f"Block {block_number}: Warning - Search content not found")
+
                 except Exception as e:
-                    overall_report.append(f"\nError reading file {file_path}: {str(e)}")
-                    current_pos += 1
-                    continue
-
-                current_pos += 1
-                total_files += 1
-
-                # Process SEARCH/REPLACE blocks for this file
-                while current_pos < len(lines):
-                    try:
-                        # Check if we've reached a new file path
-                        if current_pos < len(lines) and lines[current_pos].strip() and not lines[current_pos].strip().startswith("<<<<<<< SEARCH"):
-                            break
-
-                        # Find start of SEARCH block
-                        while current_pos < len(lines) and not lines[current_pos].strip() == "<<<<<<< SEARCH":
-                            current_pos += 1
-                        if current_pos >= len(lines):
-                            break
-
-                        block_number += 1
-                        total_blocks += 1
-                        search_lines = []
-                        current_pos += 1
-
-                        # Collect SEARCH content
-                        while current_pos < len(lines) and not lines[current_pos].strip() == "=======":
-                            search_lines.append(lines[current_pos])
-                            current_pos += 1
-                        if current_pos >= len(lines):
-                            overall_report.append(f"\nError in {file_path}: Unclosed SEARCH block")
-                            break
-
-                        replace_lines = []
-                        current_pos += 1
-
-                        # Collect REPLACE content
-                        while current_pos < len(lines) and not lines[current_pos].strip() == ">>>>>>> REPLACE":
-                            replace_lines.append(lines[current_pos])
-                            current_pos += 1
-                        if current_pos >= len(lines):
-                            overall_report.append(f"\nError in {file_path}: Unclosed REPLACE block")
-                            break
-
-                        # Perform replacement
-                        search_content = '\n'.join(search_lines)
-                        replace_content = '\n'.join(replace_lines)
-
-                        # Escape special regex characters in search string
-                        search_escaped = re.escape(search_content)
-                        # Replace newlines with regex pattern that matches both \n and \r\n
-                        search_escaped = search_escaped.replace('\\\n', '\\r?\\n')
-
-                        pattern = re.compile(search_escaped, re.MULTILINE)
-                        new_content, count = pattern.subn(replace_content, content, count=1)
-
-                        if count > 0:
-                            content = new_content
-                            modified = True
-                            successful_replacements += 1
-                            total_replacements += 1
-                            messages.append(f"Block {block_number}: Successfully replaced content")
-                        else:
-                            messages.append(f"Block {block_number}: Warning - Search content not found")
-
-                        current_pos += 1
-
-                    except Exception as e:
-                        overall_report.append(f"\nError processing SEARCH/REPLACE block {block_number} in {file_path}: {str(e)}")
-                        break
-
-                # Write modified content back to file if any changes were made
-                if modified:
-                    try:
-                        await self.file_manager.write_file(file_path, content, encoding='utf-8')
-                        
-                        # Add file report to overall report
-                        overall_report.append(f"\n```{file_path}```")
-                        overall_report.append(f"""Replacements made in {file_path}: {successful_replacements}/{block_number}
+                    overall_report.append(f"\nError processing SEARCH/REPLACE block {block_number} in {file_path}: {str(e)}")
+                    break
+
+            if parse_error:
+                # The unclosed block still counts towards the block totals
+                block_number += 1
+                total_blocks += 1
+                overall_report.append(f"\nError in {file_path}: {parse_error}")
+
+            # Write modified content back to file if any changes were made
+            if modified:
+                try:
+                    await self.file_manager.write_file(file_path, content)
+                    
+                    # Add file report to overall report
+                    overall_report.append(f"\n```{file_path}```")
+                    overall_report.append(f"""Replacements made in {file_path}: {successful_replacements}/{block_number}
 After change, the file content
 ```
 <-- -->
 ```
 """)
-                        overall_report.append("Detailed results:")
-                        overall_report.extend(["  " + msg for msg in messages])
-                    except Exception as e:
-                        overall_report.append(f"\nError writing to file {file_path}: {str(e)}")
-                else:
-                    overall_report.append(f"\nNo replacements were made in {file_path}")
+                    overall_report.append("Detailed results:")
+                    overall_report.extend(["  " + msg for msg in messages])
+                except Exception as e:
+                    overall_report.append(f"\nError writing to file {file_path}: {str(e)}")
+            else:
+                overall_report.append(f"\nNo replacements were made in {file_path}")
 
         # Generate final summary report
         if total_files == 0:
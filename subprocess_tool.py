@@ -1,4 +1,5 @@
 
+import codecs
 import subprocess
 import time
 import threading
@@ -54,37 +55,27 @@ class SubProcessTool(Tool):
     def _output_reader(self):
         """
         Background thread function, continuously reads process output.
-        Accumulates bytes and decodes them as UTF-8 when complete characters are formed.
+        Reads whatever the pipe has available, up to 64 KiB at a time, and decodes it
+        incrementally as UTF-8 so characters split across reads are kept whole.
         """
-        # Buffer for accumulating bytes
-        byte_buffer = bytearray()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
         
         while self.running:
             try:
-                byte = self.process.stdout.read(1)
-                if not byte and self.process.poll() is not None:
-                    # Process remaining bytes in buffer
-                    if byte_buffer:
-                        try:
-                            final_str = byte_buffer.decode('utf-8')
-                            self.output_queue.put(final_str)
-                        except UnicodeDecodeError:
-                            pass  # Ignore possibly incomplete characters at the end
+                # The pipe is unbuffered, so this returns as soon as any output is available
+                chunk = self.process.stdout.read(65536)
+                if not chunk:
+                    # EOF: flush any incomplete character left in the decoder
+                    final_str = decoder.decode(b'', final=True)
+                    if final_str:
+                        self.output_queue.put(final_str)
                     # Set exit_code when process ends
-                    self.exit_code = self.process.poll()
+                    self.exit_code = self.process.wait()
                     break
                 
-                if byte:
-                    byte_buffer.extend(byte)
-                    # Try to decode accumulated bytes
-                    try:
-                        decoded = byte_buffer.decode('utf-8')
-                        # If decoding succeeds, put characters into queue and clear buffer
-                        self.output_queue.put(decoded)
-                        byte_buffer.clear()
-                    except UnicodeDecodeError:
-                        # If decoding fails, continue accumulating bytes
-                        continue
+                decoded = decoder.decode(chunk)
+                if decoded:
+                    self.output_queue.put(decoded)
                         
             except Exception as e:
                 self.output_queue.put(f"Error reading output: {str(e)}")
@@ -131,8 +122,10 @@ class SubProcessTool(Tool):
                         output = self.output_queue.get_nowait()
                         last_output += output
                         
-                        if output == "\n":
-                            last_line = ""
+                        # Track the text after the most recent newline
+                        newline = output.rfind("\n")
+                        if newline >= 0:
+                            last_line = output[newline + 1:]
                         else:
                             last_line += output
                         last_change_time = current_time
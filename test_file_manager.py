@@ -0,0 +1,137 @@
+import asyncio
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import file_manager
+from file_manager import FileManager, MMAP_THRESHOLD, _read_text, _write_text
+
+class TestReadText(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def make(self, name, data):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_newlines_are_translated(self):
+        path = self.make('mixed.txt', b'a\r\nb\rc\nd\r')
+        self.assertEqual(_read_text(path), 'a\nb\nc\nd\n')
+
+    def test_large_file_matches_text_mode(self):
+        line = 'line é中\r\n'
+        data = (line * (MMAP_THRESHOLD // len(line.encode('utf-8')) + 100)).encode('utf-8')
+        self.assertGreater(len(data), MMAP_THRESHOLD)
+        path = self.make('big.txt', data)
+        with open(path, 'r', encoding='utf-8') as f:
+            self.assertEqual(_read_text(path), f.read())
+
+    def test_non_utf8_raises(self):
+        path = self.make('latin1.txt', 'café'.encode('latin-1'))
+        with self.assertRaises(UnicodeDecodeError):
+            _read_text(path)
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'needs mkfifo')
+    def test_fifo(self):
+        path = os.path.join(self.tmp, 'pipe')
+        os.mkfifo(path)
+
+        def writer():
+            with open(path, 'wb') as f:
+                f.write(b'a\r\nb')
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            self.assertEqual(_read_text(path), 'a\nb')
+        finally:
+            thread.join()
+
+class TestWriteText(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'target.txt')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('old\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def read(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_new_file(self):
+        path = os.path.join(self.tmp, 'new.txt')
+        _write_text(path, 'hello\n')
+        self.assertEqual(self.read(path), 'hello\n')
+
+    def test_existing_file_keeps_mode_and_leaves_no_temp_files(self):
+        os.chmod(self.path, 0o640)
+        _write_text(self.path, 'new\n')
+        self.assertEqual(self.read(self.path), 'new\n')
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o640)
+        self.assertEqual(os.listdir(self.tmp), ['target.txt'])
+
+    def test_read_only_file_is_written_in_place(self):
+        os.chmod(self.path, 0o444)
+        with mock.patch.object(file_manager, '_write_in_place') as in_place, \
+             mock.patch.object(file_manager.os, 'access', return_value=False):
+            _write_text(self.path, 'new\n')
+        in_place.assert_called_once_with(self.path, 'new\n')
+        self.assertEqual(self.read(self.path), 'old\n')
+
+    @unittest.skipIf(hasattr(os, 'geteuid') and os.geteuid() == 0, 'root ignores file permissions')
+    def test_read_only_file_raises(self):
+        os.chmod(self.path, 0o444)
+        with self.assertRaises(PermissionError):
+            _write_text(self.path, 'new\n')
+        self.assertEqual(self.read(self.path), 'old\n')
+
+    def test_hard_link_is_kept(self):
+        link = os.path.join(self.tmp, 'link.txt')
+        os.link(self.path, link)
+        inode = os.stat(self.path).st_ino
+        _write_text(self.path, 'new\n')
+        self.assertEqual(os.stat(self.path).st_ino, inode)
+        self.assertEqual(self.read(link), 'new\n')
+
+    def test_symlink_updates_target(self):
+        os.chmod(self.path, 0o600)
+        link = os.path.join(self.tmp, 'link.txt')
+        os.symlink(self.path, link)
+        _write_text(link, 'new\n')
+        self.assertTrue(os.path.islink(link))
+        self.assertEqual(self.read(self.path), 'new\n')
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    def test_mkstemp_failure_falls_back_to_in_place(self):
+        inode = os.stat(self.path).st_ino
+        with mock.patch.object(file_manager.tempfile, 'mkstemp', side_effect=PermissionError):
+            _write_text(self.path, 'new\n')
+        self.assertEqual(self.read(self.path), 'new\n')
+        self.assertEqual(os.stat(self.path).st_ino, inode)
+
+class TestFileManager(unittest.TestCase):
+    def test_write_then_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'a.txt')
+
+            async def run():
+                manager = FileManager()
+                await manager.write_file(path, 'a\r\nb\n')
+                manager.clear_cache()
+                return await manager.read_file(path)
+
+            self.assertEqual(asyncio.run(run()), 'a\nb\n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from find_file_tool import FindFileTool, _lev_bounded
+
+def levenshtein(a, b):
+    """Unbounded reference implementation"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+class TestLevBounded(unittest.TestCase):
+    def test_exact_distances_within_bound(self):
+        self.assertEqual(_lev_bounded("kitten", "sitting", 5), 3)
+        self.assertEqual(_lev_bounded("agent.py", "agent.py", 2), 0)
+        self.assertEqual(_lev_bounded("", "abc", 3), 3)
+        self.assertEqual(_lev_bounded("abc", "", 3), 3)
+
+    def test_cutoff_boundary(self):
+        # kitten -> sitting is 3: kept at max_k 3, cut off at 2
+        self.assertEqual(_lev_bounded("kitten", "sitting", 3), 3)
+        self.assertEqual(_lev_bounded("kitten", "sitting", 2), 3)
+        self.assertEqual(_lev_bounded("kitten", "sitting", 1), 2)
+        self.assertEqual(_lev_bounded("kitten", "sitting", 0), 1)
+
+    def test_length_difference_short_circuits(self):
+        self.assertEqual(_lev_bounded("a", "abcdef", 2), 3)
+        self.assertEqual(_lev_bounded("abcdef", "a", 5), 5)
+
+    def test_symmetric(self):
+        self.assertEqual(_lev_bounded("file_manager.py", "file_manger.py", 4),
+                         _lev_bounded("file_manger.py", "file_manager.py", 4))
+
+    def test_matches_reference_up_to_bound(self):
+        words = ["", "a", "ab", "ba", "abc", "acb", "read_file.py", "read_flie.py", "rd_file.py", "find_file_tool.py"]
+        for a in words:
+            for b in words:
+                for max_k in range(6):
+                    self.assertEqual(_lev_bounded(a, b, max_k), min(levenshtein(a, b), max_k + 1), (a, b, max_k))
+
+class TestFuzzyMatch(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        for path in ("src/a/util.py", "lib/a/util.py", "x/main.py", "README.md"):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            open(path, "w").close()
+        self.tool = FindFileTool()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def match(self, filename):
+        return asyncio.run(self.tool._fuzzy_match(filename))
+
+    def test_same_base_name_in_another_directory(self):
+        self.assertEqual(os.path.normpath(self.match("y/main.py")), os.path.join("x", "main.py"))
+
+    def test_same_base_name_prefers_closest_path(self):
+        self.assertEqual(os.path.normpath(self.match("lib/b/util.py")), os.path.join("lib", "a", "util.py"))
+
+    def test_typo(self):
+        self.assertEqual(os.path.normpath(self.match("mian.py")), os.path.join("x", "main.py"))
+
+    def test_nothing_close(self):
+        self.assertIsNone(self.match("completely_different.txt"))
+
+    def test_new_file_is_picked_up(self):
+        self.assertIsNone(self.match("notes.txt"))
+        open("notes.txt", "w").close()
+        self.assertEqual(os.path.normpath(self.match("notse.txt")), "notes.txt")
+
+class FakeStreamer:
+    def __init__(self, *answer):
+        self.answer = answer
+        self.history = ["stale"]
+        self.prompts = []
+
+    def clear_history(self):
+        self.history = []
+
+    async def chat(self, message):
+        self.prompts.append((message, list(self.history)))
+        for pair in self.answer:
+            yield pair
+
+class TestLLMFallback(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        os.makedirs("src")
+        open("src/config.py", "w").close()
+        self.env = os.environ.get("SKRYVIX_LLM_FUZZY_MATCH")
+        os.environ["SKRYVIX_LLM_FUZZY_MATCH"] = "1"
+
+    def tearDown(self):
+        if self.env is None:
+            os.environ.pop("SKRYVIX_LLM_FUZZY_MATCH", None)
+        else:
+            os.environ["SKRYVIX_LLM_FUZZY_MATCH"] = self.env
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def match(self, streamer):
+        return asyncio.run(FindFileTool(streamer)._fuzzy_match("settings.yaml"))
+
+    def test_skips_reasoning_tokens(self):
+        streamer = FakeStreamer(("thinking about ./src/x.py", True), ("`./src/", False), ("config.py`\n", False))
+        self.assertEqual(self.match(streamer), "./src/config.py")
+        self.assertEqual(len(streamer.prompts), 1)
+        self.assertEqual(streamer.prompts[0][1], [])
+
+    def test_answer_must_be_listed(self):
+        self.assertIsNone(self.match(FakeStreamer(("/etc/passwd", False))))
+        self.assertIsNone(self.match(FakeStreamer(("Exception: connection refused", False))))
+        self.assertIsNone(self.match(FakeStreamer()))
+
+    def test_off_without_env(self):
+        del os.environ["SKRYVIX_LLM_FUZZY_MATCH"]
+        streamer = FakeStreamer(("./src/config.py", False))
+        self.assertIsNone(self.match(streamer))
+        self.assertEqual(streamer.prompts, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import io
+import sys
+import threading
+import unittest
+import output_router
+from output_router import QueuedOutput, run_captured
+
+_SENTINEL = object()
+
+async def collect(queue):
+    """Read chunks from the queue until the sentinel"""
+    chunks = []
+    while True:
+        chunk = await queue.get()
+        if chunk is _SENTINEL:
+            return chunks
+        chunks.append(chunk)
+
+class TestQueuedOutput(unittest.IsolatedAsyncioTestCase):
+    async def run_writer(self, writer, **kwargs):
+        """Call writer(sink) in a thread, close the sink afterwards and return the queued chunks"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        sink = QueuedOutput(loop, queue, **kwargs)
+        future = loop.run_in_executor(None, writer, sink)
+        future.add_done_callback(lambda _: sink.close(_SENTINEL))
+        chunks = await collect(queue)
+        await future
+        return sink, chunks
+
+    async def test_small_writes_are_coalesced(self):
+        def writer(sink):
+            for i in range(100):
+                sink.write(f"{i}\n")
+
+        _, chunks = await self.run_writer(writer, delay=1)
+        self.assertEqual(chunks, ["".join(f"{i}\n" for i in range(100))])
+
+    async def test_limit_forces_a_chunk(self):
+        # With a long delay, only reaching the limit can get the text queued
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        sink = QueuedOutput(loop, queue, delay=10, limit=10)
+        await loop.run_in_executor(None, sink.write, "a" * 10)
+        self.assertEqual(await asyncio.wait_for(queue.get(), 1), "a" * 10)
+
+    async def test_delay_drains_without_close(self):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        sink = QueuedOutput(loop, queue, delay=0.01)
+        await loop.run_in_executor(None, sink.write, "hello")
+        self.assertEqual(await asyncio.wait_for(queue.get(), 1), "hello")
+
+    async def test_flush_queues_buffered_text(self):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        sink = QueuedOutput(loop, queue, delay=10)
+        await loop.run_in_executor(None, lambda: (sink.write("x"), sink.flush()))
+        self.assertEqual(await asyncio.wait_for(queue.get(), 1), "x")
+
+    async def test_empty_writes_are_ignored(self):
+        sink, chunks = await self.run_writer(lambda sink: sink.write(""))
+        self.assertEqual(chunks, [])
+        self.assertTrue(sink.closed)
+
+class TestRunCaptured(unittest.TestCase):
+    def test_captures_calling_thread(self):
+        out = io.StringIO()
+        run_captured(print, "captured", stdout=out)
+        self.assertEqual(out.getvalue(), "captured\n")
+
+    def test_captures_threads_started_during_the_run(self):
+        out = io.StringIO()
+
+        def spawn():
+            thread = threading.Thread(target=print, args=("from thread",))
+            thread.start()
+            thread.join()
+
+        run_captured(spawn, stdout=out)
+        self.assertEqual(out.getvalue(), "from thread\n")
+
+    def test_other_threads_are_not_captured(self):
+        out = io.StringIO()
+        other = io.StringIO()
+        started = threading.Event()
+        release = threading.Event()
+
+        def outside():
+            # Runs in a thread that was not started by the captured call
+            started.set()
+            release.wait()
+            run_captured(print, "other", stdout=other)
+
+        thread = threading.Thread(target=outside)
+        thread.start()
+        started.wait()
+        run_captured(lambda: (release.set(), print("mine")), stdout=out)
+        thread.join()
+        self.assertEqual(out.getvalue(), "mine\n")
+        self.assertEqual(other.getvalue(), "other\n")
+
+    def test_closed_sink_falls_back_to_stream(self):
+        output_router.install()
+        router = sys.stdout
+        sink = QueuedOutput(None, None)
+        sink.closed = True
+        token = router.sink.set(sink)
+        try:
+            self.assertIsNone(router.current_sink())
+        finally:
+            router.sink.reset(token)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import asyncio
+import unittest
+from replace_in_file_tool import ReplaceInFileTool, _parse_blocks
+
+class FakeFileManager:
+    """In-memory stand-in for FileManager"""
+    def __init__(self, files):
+        self.files = dict(files)
+
+    async def read_file(self, path):
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        return self.files[path]
+
+    async def write_file(self, path, content):
+        self.files[path] = content
+
+class TestParseBlocks(unittest.TestCase):
+    def test_single_block(self):
+        text = "a.txt\n<<<<<<< SEARCH\nold\n=======\nnew\n>>>>>>> REPLACE"
+        self.assertEqual(_parse_blocks(text), [("a.txt", [("old", "new")], None)])
+
+    def test_multiple_files_and_blocks(self):
+        text = (
+            "a.txt\n"
+            "<<<<<<< SEARCH\none\ntwo\n=======\n1\n2\n>>>>>>> REPLACE\n"
+            "\n"
+            "<<<<<<< SEARCH\nthree\n=======\n3\n>>>>>>> REPLACE\n"
+            "b.txt\n"
+            "<<<<<<< SEARCH\nfour\n=======\n4\n>>>>>>> REPLACE\n"
+        )
+        self.assertEqual(_parse_blocks(text), [
+            ("a.txt", [("one\ntwo", "1\n2"), ("three", "3")], None),
+            ("b.txt", [("four", "4")], None),
+        ])
+
+    def test_paths_without_blocks(self):
+        text = "a.txt\nb.txt\n<<<<<<< SEARCH\nx\n=======\ny\n>>>>>>> REPLACE\nc.txt"
+        self.assertEqual(_parse_blocks(text), [
+            ("a.txt", [], None),
+            ("b.txt", [("x", "y")], None),
+            ("c.txt", [], None),
+        ])
+
+    def test_unclosed_search_block(self):
+        text = "a.txt\n<<<<<<< SEARCH\nx\n=======\ny\n>>>>>>> REPLACE\n<<<<<<< SEARCH\nz\n"
+        self.assertEqual(_parse_blocks(text), [("a.txt", [("x", "y")], "Unclosed SEARCH block")])
+
+    def test_unclosed_replace_block(self):
+        text = "a.txt\n<<<<<<< SEARCH\nx\n=======\ny\n"
+        self.assertEqual(_parse_blocks(text), [("a.txt", [], "Unclosed REPLACE block")])
+
+    def test_empty_search_and_replace(self):
+        text = "a.txt\n<<<<<<< SEARCH\n=======\n>>>>>>> REPLACE"
+        self.assertEqual(_parse_blocks(text), [("a.txt", [("", "")], None)])
+
+    def test_markers_with_surrounding_whitespace(self):
+        text = "  a.txt  \n  <<<<<<< SEARCH \t\nx\n\t=======  \ny\n>>>>>>> REPLACE   "
+        self.assertEqual(_parse_blocks(text), [("a.txt", [("x", "y")], None)])
+
+    def test_crlf_input(self):
+        text = "a.txt\r\n<<<<<<< SEARCH\r\nx\r\nz\r\n=======\r\ny\r\n>>>>>>> REPLACE\r\n"
+        self.assertEqual(_parse_blocks(text), [("a.txt", [("x\nz", "y")], None)])
+
+    def test_marker_text_inside_content(self):
+        # Only the marker that closes the current section ends it
+        text = "a.txt\n<<<<<<< SEARCH\n<<<<<<< SEARCH\n=======\n=======\n>>>>>>> REPLACE"
+        self.assertEqual(_parse_blocks(text), [("a.txt", [("<<<<<<< SEARCH", "=======")], None)])
+
+    def test_search_before_any_file_path(self):
+        text = "<<<<<<< SEARCH\nx\n=======\ny\n>>>>>>> REPLACE\na.txt"
+        self.assertEqual(_parse_blocks(text), [("a.txt", [], None)])
+
+class TestReplaceInFileTool(unittest.TestCase):
+    def run_tool(self, files, args):
+        file_manager = FakeFileManager(files)
+        tool = ReplaceInFileTool(file_manager)
+
+        async def collect():
+            return [output async for output in tool(args)]
+
+        return asyncio.run(collect()), file_manager.files
+
+    def test_replaces_first_occurrence_per_block(self):
+        args = (
+            "a.txt\n"
+            "<<<<<<< SEARCH\nb\n=======\nB\n>>>>>>> REPLACE\n"
+            "<<<<<<< SEARCH\nx\n=======\nX\n>>>>>>> REPLACE\n"
+        )
+        output, files = self.run_tool({"a.txt": "a\nx\nb\nx\n"}, args)
+        self.assertEqual(files["a.txt"], "a\nX\nB\nx\n")
+        self.assertIn("Total replacements made: 2/2", output[0])
+
+    def test_replacement_backslashes_are_literal(self):
+        args = "a.txt\n<<<<<<< SEARCH\npath\n=======\nC:\\new\\1\n>>>>>>> REPLACE"
+        _, files = self.run_tool({"a.txt": "path\n"}, args)
+        self.assertEqual(files["a.txt"], "C:\\new\\1\n")
+
+    def test_crlf_content_uses_regex_path(self):
+        args = "a.txt\n<<<<<<< SEARCH\none\ntwo\n=======\n1\n>>>>>>> REPLACE"
+        _, files = self.run_tool({"a.txt": "one\r\ntwo\r\n"}, args)
+        self.assertEqual(files["a.txt"], "1\r\n")
+
+    def test_search_not_found(self):
+        args = "a.txt\n<<<<<<< SEARCH\nmissing\n=======\nx\n>>>>>>> REPLACE"
+        output, files = self.run_tool({"a.txt": "text\n"}, args)
+        self.assertEqual(files["a.txt"], "text\n")
+        self.assertIn("No replacements were made in a.txt", output[0])
+
+    def test_unclosed_block_is_reported(self):
+        args = "a.txt\n<<<<<<< SEARCH\ntext\n=======\nnew\n"
+        output, _ = self.run_tool({"a.txt": "text\n"}, args)
+        self.assertIn("Total replacements made: 0/1", output[0])
+        self.assertIn("Error in a.txt: Unclosed REPLACE block", output[0])
+
+    def test_missing_file_skips_its_blocks(self):
+        args = (
+            "missing.txt\n<<<<<<< SEARCH\nx\n=======\ny\n>>>>>>> REPLACE\n"
+            "a.txt\n<<<<<<< SEARCH\ntext\n=======\nnew\n>>>>>>> REPLACE\n"
+        )
+        output, files = self.run_tool({"a.txt": "text\n"}, args)
+        self.assertEqual(files["a.txt"], "new\n")
+        self.assertIn("Error: File not found: missing.txt", output[0])
+
+    def test_blocks_without_file_path(self):
+        output, _ = self.run_tool({}, "<<<<<<< SEARCH\nx\n=======\ny\n>>>>>>> REPLACE")
+        self.assertEqual(output, ["Error: No valid files processed"])
+
+    def test_empty_input(self):
+        output, _ = self.run_tool({}, "  \n ")
+        self.assertEqual(output, ["Error: Empty input"])
+
+if __name__ == '__main__':
+    unittest.main()